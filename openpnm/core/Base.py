@@ -742,7 +742,11 @@ class Base(dict):
             raise Exception('Cannot proceed without {}.all'.format(element))
 
         # Begin computing label array
-        if mode in ['or', 'any', 'union']:
+        if (len(labels) == 1) and (mode in ['or', 'any', 'union',
+                                            'and', 'all', 'intersection']):
+            # A single label needs no combining, so use it directly
+            ind = self[element+'.'+labels[0].split('.')[-1]]
+        elif mode in ['or', 'any', 'union']:
             union = np.zeros_like(self[element+'.all'], dtype=bool)
             for item in labels:  # Iterate over labels and collect all indices
                 union = union + self[element+'.'+item.split('.')[-1]]
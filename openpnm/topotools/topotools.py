@@ -216,13 +216,15 @@ def find_neighbor_bonds(sites, im=None, am=None, flatten=True, logic='or'):
             raise Exception('flatten cannot be used with an adjacency matrix')
         Ps = np.zeros(am.shape[0], dtype=bool)
         Ps[sites] = True
-        conns = np.vstack((am.row, am.col)).T
+        # Whether each end of every bond is an input site
+        head = Ps[am.row]
+        tail = Ps[am.col]
         if logic in ['or', 'union', 'any']:
-            neighbors = np.any(Ps[conns], axis=1)
+            neighbors = head | tail
         elif logic in ['xor', 'exclusive_or']:
-            neighbors = np.sum(Ps[conns], axis=1) == 1
+            neighbors = head ^ tail
         elif logic in ['xnor', 'shared']:
-            neighbors = np.all(Ps[conns], axis=1)
+            neighbors = head & tail
         elif logic in ['and', 'all', 'intersection']:
             raise Exception('Specified logic is not implemented')
         else:
@@ -705,21 +707,26 @@ def ispercolating(am, inlets, outlets, mode='site'):
 
     """
     if am.format != 'coo':
-        am = am.to_coo()
+        am = am.tocoo()
     ij = np.vstack((am.col, am.row)).T
+    occupied_bonds = am.data.astype(bool)
+    # In both modes a site is occupied if any of its bonds are
+    occupied_sites = np.zeros(shape=am.shape[0], dtype=bool)
+    occupied_sites[ij[occupied_bonds].flatten()] = True
     if mode.startswith('site'):
-        occupied_sites = np.zeros(shape=am.shape[0], dtype=bool)
-        occupied_sites[ij[am.data].flatten()] = True
-        clusters = site_percolation(ij, occupied_sites)
-    elif mode.startswith('bond'):
-        occupied_bonds = am.data
-        clusters = bond_percolation(ij, occupied_bonds)
-    ins = np.unique(clusters.sites[inlets])
-    if ins[0] == -1:
-        ins = ins[1:]
-    outs = np.unique(clusters.sites[outlets])
-    if outs[0] == -1:
-        outs = outs[1:]
+        # Any bond between two occupied sites joins them into a cluster
+        occupied_bonds = np.all(occupied_sites[ij], axis=1)
+    elif not mode.startswith('bond'):
+        raise Exception('Unrecognized mode ' + mode)
+    adj_mat = sprs.csr_matrix((occupied_bonds, (ij[:, 0], ij[:, 1])),
+                              shape=am.shape)
+    adj_mat.eliminate_zeros()
+    clusters = csgraph.connected_components(csgraph=adj_mat, directed=False)[1]
+    clusters[~occupied_sites] = -1
+    ins = np.unique(clusters[inlets])
+    ins = ins[ins >= 0]
+    outs = np.unique(clusters[outlets])
+    outs = outs[outs >= 0]
     hits = np.in1d(ins, outs)
     return np.any(hits)
 
@@ -1298,14 +1305,14 @@ def find_surface_pores(network, markers=None, label='surface'):
                 raise Exception('Markers must be 3D for this network')
     pts = np.vstack((coords, markers))
     tri = sptl.Delaunay(pts, incremental=False)
-    (indices, indptr) = tri.vertex_neighbor_vertices
-    for k in range(network.Np, tri.npoints):
-        neighbors = indptr[indices[k]:indices[k+1]]
-        inds = np.where(neighbors < network.Np)
-        neighbors = neighbors[inds]
-        if 'pore.'+label not in network.keys():
-            network['pore.'+label] = False
-        network['pore.'+label][neighbors] = True
+    (indptr, indices) = tri.vertex_neighbor_vertices
+    # The markers were appended after the pores, so all their neighbors
+    # occupy a single contiguous block of the (CSR-style) neighbor list
+    neighbors = indices[indptr[network.Np]:indptr[tri.npoints]]
+    neighbors = neighbors[neighbors < network.Np]
+    if 'pore.'+label not in network.keys():
+        network['pore.'+label] = False
+    network['pore.'+label][neighbors] = True
 
 
 def dimensionality(network):
@@ -1379,7 +1386,10 @@ def clone_pores(network, pores, labels=['clone'], mode='parents'):
         extend(network=network, pore_coords=pclone, throat_conns=tclone)
     if mode == 'siblings':
         ts = network.find_neighbor_throats(pores=pores, mode='xnor')
-        tclone = network['throat.conns'][ts] + network.num_pores()
+        # Map each parent index onto the index of its clone
+        mapping = np.zeros((Np, ), dtype=int)
+        mapping[parents] = clones
+        tclone = mapping[network['throat.conns'][ts]]
         extend(network=network, pore_coords=pclone, throat_conns=tclone)
     if mode == 'isolated':
         extend(network=network, pore_coords=pclone)
@@ -1423,6 +1433,9 @@ def merge_networks(network, donor=[]):
         donors = [donor]
 
     for donor in donors:
+        # Number of pores and throats on the network and donor respectively
+        counts = {'pore': (network.Np, donor.Np),
+                  'throat': (network.Nt, donor.Nt)}
         network['pore.coords'] = np.vstack((network['pore.coords'],
                                             donor['pore.coords']))
         network['throat.conns'] = np.vstack((network['throat.conns'],
@@ -1433,43 +1446,28 @@ def merge_networks(network, donor=[]):
         network.update({'pore.all': p_all})
         network.update({'throat.all': t_all})
         for key in set(network.keys()).union(set(donor.keys())):
-            if key.split('.')[1] not in ['conns', 'coords', '_id', 'all']:
-                if key in network.keys():
-                    pop_flag = False
-                    # If key not on donor add it first with dummy values to
-                    # simplify merging later
-                    if key not in donor.keys():
-                        logger.debug('Adding ' + key + ' to donor')
-                        if network[key].dtype == bool:  # Deal with labels
-                            donor[key] = False
-                        else:  # Deal with numerical data
-                            element = key.split('.')[0]
-                            shape = list(network[key].shape)
-                            N = donor._count(element)
-                            shape[0] = N
-                            donor[key] = sp.empty(shape=shape)*sp.nan
-                        pop_flag = True
-                    # Then merge it with existing array on network
-                    if len(network[key].shape) == 1:
-                        temp = np.hstack((network[key], donor[key]))
-                    else:
-                        temp = np.vstack((network[key], donor[key]))
-                    network[key] = temp
-                    if pop_flag:
-                        donor.pop(key, None)
-                else:
-                    # If key not on network add it first
-                    logger.debug('Adding ' + key + ' to network')
-                    if donor[key].dtype == bool:
-                        network[key] = False
-                    else:
-                        data_shape = list(donor[key].shape)
-                        pore_prop = True if key.split(".")[0] == "pore" else False
-                        data_shape[0] = network.Np if pore_prop else network.Nt
-                        network[key] = sp.empty(data_shape) * sp.nan
-                    # Then append donor values to network
-                    s = np.shape(donor[key])[0]
-                    network[key][-s:] = donor[key]
+            if key.split('.')[1] in ['conns', 'coords', '_id', 'all']:
+                continue
+            N1, N2 = counts[key.split('.')[0]]
+            vals1 = network[key] if key in network.keys() else None
+            vals2 = donor[key] if key in donor.keys() else None
+            # Determine the type of the merged array.  If the key is missing
+            # from either object its locations will be filled with False
+            # for labels or nans for numerical data.
+            ref = vals1 if vals1 is not None else vals2
+            if (vals1 is not None) and (vals2 is not None):
+                dtype = np.result_type(vals1, vals2)
+            elif ref.dtype == bool:
+                dtype = bool
+            else:
+                # Promote to hold nans, so ints become floats but objects stay
+                dtype = np.result_type(ref.dtype, float)
+            fill = False if dtype == bool else np.nan
+            # Allocate the merged array once and copy each part into it
+            temp = np.empty((N1 + N2, *ref.shape[1:]), dtype=dtype)
+            temp[:N1] = vals1 if vals1 is not None else fill
+            temp[N1:] = vals2 if vals2 is not None else fill
+            network[key] = temp
 
     # Clear adjacency and incidence matrices which will be out of date now
     network._am.clear()
@@ -1698,12 +1696,14 @@ def find_pore_to_pore_distance(network, pores1=None, pores2=None):
     -------
     A distance matrix with ``len(pores1)`` rows and ``len(pores2)`` columns.
     The distance between pore *i* in ``pores1`` and *j* in ``pores2`` is
-    located at *(i, j)* and *(j, i)* in the distance matrix.
+    located at *(i, j)* in the distance matrix.
 
     Notes
     -----
     This function computes and returns a distance matrix, which is a dense
-    matrix of size Np_1 by Np_2, so can get large.  For distances between
+    matrix of size Np_1 by Np_2, so can get large.  The full matrix is
+    computed in a single call to ``scipy.spatial.distance.cdist`` so no
+    intermediate (Np_1, Np_2, 3) array is created.  For distances between
     larger sets a KD-tree approach would be better, which is available in
     ``scipy.spatial``.
 
@@ -1712,7 +1712,9 @@ def find_pore_to_pore_distance(network, pores1=None, pores2=None):
     p1 = np.array(pores1, ndmin=1)
     p2 = np.array(pores2, ndmin=1)
     coords = network['pore.coords']
-    return cdist(coords[p1], coords[p2])
+    c1 = np.ascontiguousarray(coords[p1], dtype=float)
+    c2 = np.ascontiguousarray(coords[p2], dtype=float)
+    return cdist(c1, c2, metric='euclidean')
 
 
 def subdivide(network, pores, shape, labels=[]):
@@ -1832,8 +1834,8 @@ def subdivide(network, pores, shape, labels=[]):
         surf_coord = network['pore.coords'][surf_pores]
         for neighbor in Pn:
             neighbor_coord = network['pore.coords'][neighbor]
-            dist = [round(sp.inner(neighbor_coord-x, neighbor_coord-x),
-                          20) for x in surf_coord]
+            dist = np.round(np.sum((surf_coord - neighbor_coord)**2, axis=1),
+                            20)
             nearest_neighbor = surf_pores[dist == np.amin(dist)]
             if neighbor in Pn_old_net:
                 coplanar_labels = network.labels(pores=nearest_neighbor)
@@ -2006,24 +2008,17 @@ def _template_sphere_disc(dim, outer_radius, inner_radius):
     elsewhere.
 
     """
-    rmax = np.array(outer_radius, ndmin=1)
-    rmin = np.array(inner_radius, ndmin=1)
-    ind = 2 * rmax - 1
-    coord = sp.indices((ind * np.ones(dim, dtype=int)))
-    coord = coord - (ind - 1)/2
-    x = coord[0, :]
-    y = coord[1, :]
-    if dim == 2:
-        img = (x ** 2 + y ** 2) < rmax ** 2
-    elif dim == 3:
-        z = coord[2, :]
-        img = (x ** 2 + y ** 2 + z ** 2) < rmax ** 2
-    if rmin[0] != 0:
-        if dim == 2:
-            img_min = (x ** 2 + y ** 2) > rmin ** 2
-        elif dim == 3:
-            img_min = (x ** 2 + y ** 2 + z ** 2) > rmin ** 2
-        img = img * img_min
+    if outer_radius != int(outer_radius):
+        raise Exception('outer_radius must be an integer number of nodes')
+    rmax = int(outer_radius)
+    # Open grids broadcast against each other, so the squared distance field
+    # is built without storing a dense array of coordinates
+    r = rmax - 1
+    axes = np.ogrid[(slice(-r, r + 1),) * dim]
+    d2 = sum(ax ** 2 for ax in axes)
+    img = d2 < rmax ** 2
+    if inner_radius != 0:
+        img &= d2 > inner_radius ** 2
     return img
 
 
@@ -2870,7 +2865,7 @@ def add_boundary_pores(network, pores, offset=None, move_to=None,
     """
     # Parse the input pores
     Ps = np.array(pores, ndmin=1)
-    if Ps.dtype is bool:
+    if Ps.dtype == bool:
         Ps = network.toindices(Ps)
     if np.size(pores) == 0:  # Handle an empty array if given
         return np.array([], dtype=sp.int64)
@@ -2965,7 +2960,7 @@ def find_path(network, pore_pairs, weights=None):
     return dict_
 
 
-def iscoplanar(coords):
+def iscoplanar(coords, tol=1e-8):
     r'''
     Determines if given pores are coplanar with each other
 
@@ -2973,48 +2968,30 @@ def iscoplanar(coords):
     ----------
     coords : array_like
         List of pore coords to check for coplanarity.  At least 3 pores are
-        required.
+        required, each with 3 coordinates.
+
+    tol : float
+        The tolerance on the ratio of the smallest to the largest singular
+        value of the centered coordinates, below which the points are
+        considered to lie on a plane.  The default is 1e-8.
 
     Returns
     -------
     A boolean value of whether given points are coplanar (True) or not (False)
+
+    Notes
+    -----
+    The points are coplanar if the matrix of coordinates, once centered on
+    their mean, has a rank of 2 or less.  This is checked using a single
+    singular value decomposition rather than searching for non-parallel
+    basis vectors.
+
     '''
-    coords = np.array(coords, ndmin=1)
+    coords = np.array(coords, ndmin=1, dtype=float)
     if np.shape(coords)[0] < 3:
         raise Exception('At least 3 input pores are required')
-
-    Px = coords[:, 0]
-    Py = coords[:, 1]
-    Pz = coords[:, 2]
-
-    # Do easy check first, for common coordinate
-    if np.shape(np.unique(Px))[0] == 1:
-        return True
-    if np.shape(np.unique(Py))[0] == 1:
-        return True
-    if np.shape(np.unique(Pz))[0] == 1:
-        return True
-
-    # Perform rigorous check using vector algebra
-    # Grab first basis vector from list of coords
-    n1 = np.array((Px[1] - Px[0], Py[1] - Py[0], Pz[1] - Pz[0])).T
-    n = np.array([0.0, 0.0, 0.0])
-    i = 1
-    while n.sum() == 0:
-        if i >= (np.size(Px) - 1):
-            logger.warning('No valid basis vectors found')
-            return False
-        # Chose a secon basis vector
-        n2 = np.array((Px[i+1] - Px[i], Py[i+1] - Py[i], Pz[i+1] - Pz[i])).T
-        # Find their cross product
-        n = np.cross(n1, n2)
-        i += 1
-    # Create vectors between all other pairs of points
-    r = np.array((Px[1:-1] - Px[0], Py[1:-1] - Py[0], Pz[1:-1] - Pz[0]))
-    # Ensure they all lie on the same plane
-    n_dot = np.dot(n, r)
-
-    if np.sum(np.absolute(n_dot)) == 0:
-        return True
-    else:
-        return False
+    if (coords.ndim != 2) or (coords.shape[1] != 3):
+        raise Exception('Coordinates must be given in 3D')
+    X = coords - np.mean(coords, axis=0)
+    s = np.linalg.svd(X, compute_uv=False)
+    return bool(s[-1] <= tol * s[0])
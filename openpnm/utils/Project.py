@@ -839,7 +839,7 @@ class Project(list):
             health[item] = []
             if obj[item].dtype == 'O':
                 health[item] = 'No checks on object'
-            elif np.sum(np.isnan(obj[item])) > 0:
+            elif np.isnan(obj[item]).any():
                 health[item] = 'Has NaNs'
             elif np.shape(obj[item])[0] != obj._count(item.split('.')[0]):
                 health[item] = 'Wrong Length'
@@ -899,19 +899,20 @@ class Project(list):
         if np.size(hits) > 0:
             health['looped_throats'] = hits
 
-        # Check for individual isolated pores
-        Ps = net.num_neighbors(net.pores())
+        # Check for individual isolated pores, ignoring looped throats
+        conns = P12[P12[:, 0] != P12[:, 1]]
+        Ps = np.bincount(conns.flatten(), minlength=net.Np)
         if np.sum(Ps == 0) > 0:
             health['isolated_pores'] = np.where(Ps == 0)[0]
 
         # Check for separated clusters of pores
-        temp = []
         am = net.create_adjacency_matrix(fmt='coo', triu=True)
-        Cs = csg.connected_components(am, directed=False)[1]
-        if np.unique(Cs).size > 1:
-            for i in np.unique(Cs):
-                temp.append(np.where(Cs == i)[0])
-            b = np.array([len(item) for item in temp])
+        N, Cs = csg.connected_components(am, directed=False)
+        if N > 1:
+            # Group pores by cluster using a single sort rather than
+            # scanning all pores once per cluster
+            b = np.bincount(Cs)
+            temp = np.split(np.argsort(Cs, kind='stable'), np.cumsum(b)[:-1])
             c = np.argsort(b)[::-1]
             for i in range(0, len(c)):
                 health['disconnected_clusters'].append(temp[c[i]])
@@ -0,0 +1,5 @@
+import matplotlib
+
+# Select the non-interactive backend once, before any test imports pyplot,
+# so plotting tests neither need a display nor initialize a GUI backend
+matplotlib.use('Agg')
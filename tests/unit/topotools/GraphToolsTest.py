@@ -442,8 +442,9 @@ class GraphToolsTest:
 
     def test_find_clusters_sites(self):
         net = op.network.Cubic(shape=[10, 10, 10])
-        net['pore.seed'] = np.random.rand(net.Np)
-        net['throat.seed'] = np.random.rand(net.Nt)
+        rng = np.random.default_rng(1)
+        net['pore.seed'] = rng.random(net.Np)
+        net['throat.seed'] = rng.random(net.Nt)
         clusters = topotools.find_clusters(network=net,
                                            mask=net['pore.seed'] < 0.5)
         assert len(clusters[0]) == net.Np
@@ -451,8 +452,9 @@ class GraphToolsTest:
 
     def test_find_clusters_bonds(self):
         net = op.network.Cubic(shape=[10, 10, 10])
-        net['pore.seed'] = np.random.rand(net.Np)
-        net['throat.seed'] = np.random.rand(net.Nt)
+        rng = np.random.default_rng(1)
+        net['pore.seed'] = rng.random(net.Np)
+        net['throat.seed'] = rng.random(net.Nt)
         clusters = topotools.find_clusters(network=net,
                                            mask=net['throat.seed'] < 0.5)
         assert len(clusters[0]) == net.Np
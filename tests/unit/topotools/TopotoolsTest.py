@@ -1,60 +1,74 @@
 import pytest
 import numpy as np
 import openpnm as op
+import matplotlib
+matplotlib.use('Agg')
 import matplotlib.pyplot as plt
 from numpy.testing import assert_allclose
+from skimage.morphology import ball
 from openpnm import topotools
 
+# Pores of a [1, 10, 10] Cubic network merged in test_merge_pores_coords
+MERGE_IDX = np.array([14, 15, 16, 24, 25, 26, 34, 35, 36], dtype=np.int64)
+# Spherical template used in test_find_surface_pores_default_markers
+BALL3 = ball(3)
+
 
 class TopotoolsTest:
 
     def setup_class(self):
         self.ws = op.Workspace()
+        # Pristine networks shared by the tests, see _copy
+        self.net_3 = op.network.Cubic(shape=[3, 3, 3], connectivity=6)
+        self.net_5 = op.network.Cubic(shape=[5, 5, 5])
+        self.net_10 = op.network.Cubic(shape=[10, 10, 10])
+        self.net_10_26 = op.network.Cubic(shape=[10, 10, 10],
+                                          connectivity=26)
+        self.net_2d = op.network.Cubic(shape=[2, 2, 1])
+        self.net_1_10 = op.network.Cubic(shape=[1, 10, 10])
+
+    def _copy(self, net):
+        # Tests that alter the network must work on a copy of its project
+        return net.project.copy().network
 
     def teardown_class(self):
         self.ws.clear()
 
     def test_reduce_coordination(self):
-        net = op.network.Cubic(shape=[10, 10, 10], connectivity=26)
-        a = np.mean(net.num_neighbors(pores=net.Ps, flatten=False))
+        net = self._copy(self.net_10_26)
+        # Average coordination number, as no throats are duplicated
+        a = 2 * net.Nt / net.Np
         b = 20.952
         assert a == b
         topotools.reduce_coordination(network=net, z=6)
-        a = np.mean(net.num_neighbors(pores=net.Ps, flatten=False))
+        a = 2 * net.Nt / net.Np
         b = 6.0
         assert_allclose(a, b)
         h = net.check_network_health()
         assert h.health
 
     def test_label_faces(self):
-        net = op.network.Cubic(shape=[3, 3, 3], connectivity=6)
+        net = self._copy(self.net_3)
         net.clear(mode='labels')
         assert net.labels() == ['pore.all', 'throat.all']
         topotools.label_faces(network=net)
-        assert net.num_pores('surface') == 26
-        assert net.num_pores('left') == 9
-        assert net.num_pores('right') == 9
-        assert net.num_pores('front') == 9
-        assert net.num_pores('back') == 9
-        assert net.num_pores('top') == 9
-        assert net.num_pores('bottom') == 9
+        expected = {'surface': 26, 'left': 9, 'right': 9, 'front': 9,
+                    'back': 9, 'top': 9, 'bottom': 9}
+        counts = {k: int(net['pore.' + k].sum()) for k in expected}
+        assert counts == expected
 
     def test_label_faces_tol(self):
-        net = op.network.Cubic(shape=[3, 3, 3], spacing=1, connectivity=6)
+        net = self._copy(self.net_3)
         net.clear(mode='labels')
         net['pore.coords'] += np.array([5, 5, 5])
         topotools.label_faces(network=net, tol=0.2)
-        assert net.num_pores('surface') == 26
-        assert net.num_pores('left') == 9
-        assert net.num_pores('right') == 9
-        assert net.num_pores('front') == 9
-        assert net.num_pores('back') == 9
-        assert net.num_pores('top') == 9
-        assert net.num_pores('bottom') == 9
+        expected = {'surface': 26, 'left': 9, 'right': 9, 'front': 9,
+                    'back': 9, 'top': 9, 'bottom': 9}
+        counts = {k: int(net['pore.' + k].sum()) for k in expected}
+        assert counts == expected
 
     def test_find_surface_pores_default_markers(self):
-        from skimage.morphology import ball
-        net = op.network.CubicTemplate(template=ball(3), spacing=1)
+        net = op.network.CubicTemplate(template=BALL3, spacing=1)
         net.clear(mode='labels')
         assert net.labels() == ['pore.all', 'throat.all']
         topotools.find_surface_pores(network=net)
@@ -89,13 +103,13 @@ class TopotoolsTest:
             topotools.find_surface_pores(network=net, markers=markers)
 
     def test_find_pore_to_pore_distance(self):
-        net = op.network.Cubic(shape=[3, 3, 3], connectivity=6)
+        net = self.net_3
         dm = topotools.find_pore_to_pore_distance(network=net,
                                                   pores1=net.pores('left'),
                                                   pores2=net.pores('right'))
-        a = np.unique(dm)
+        a = np.unique(np.round(dm, 6))
         b = np.array([2., 2.23606798, 2.44948974, 2.82842712, 3., 3.46410162])
-        assert np.allclose(a, b)
+        assert_allclose(a, b, rtol=1e-6)
 
     def test_template_sphere_shell(self):
         im = topotools.template_sphere_shell(outer_radius=4, inner_radius=2)
@@ -107,6 +121,15 @@ class TopotoolsTest:
         assert net.Np == 251
         assert net.Nt == 618
 
+    def test_template_fractional_inner_radius(self):
+        im = topotools.template_sphere_shell(outer_radius=4, inner_radius=1.5)
+        assert im.sum() == 232
+        im = topotools.template_cylinder_annulus(height=2, outer_radius=4,
+                                                 inner_radius=2.5)
+        assert im.sum() == 48
+        with pytest.raises(Exception):
+            topotools.template_sphere_shell(outer_radius=2.5)
+
     def test_template_cylinder_annulus(self):
         im = topotools.template_cylinder_annulus(height=10, outer_radius=4,
                                                  inner_radius=2)
@@ -123,34 +146,51 @@ class TopotoolsTest:
         assert net.Nt == 76
 
     def test_add_boundary_pores(self):
-        net = op.network.Cubic(shape=[5, 5, 5])
+        net = self._copy(self.net_5)
         topotools.add_boundary_pores(network=net, pores=net.pores('left'),
                                      offset=[0, 1, 0])
         assert net.Np == 150
 
     def test_clone_pores_mode_parents(self):
-        net = op.network.Cubic(shape=[5, 5, 5])
+        net = self._copy(self.net_5)
         topotools.clone_pores(network=net, pores=net.pores('left'))
         assert net.Np == 150
         assert net.Nt == 325
 
     def test_clone_pores_mode_sibings(self):
-        net = op.network.Cubic(shape=[5, 5, 5])
+        net = self._copy(self.net_5)
         topotools.clone_pores(network=net, pores=net.pores('left'),
                               mode='siblings')
         assert net.Np == 150
         assert net.Nt == 340
 
+    def test_clone_pores_mode_siblings_not_leading_pores(self):
+        net = self._copy(self.net_5)
+        topotools.clone_pores(network=net, pores=net.pores('right'),
+                              mode='siblings')
+        assert net.Np == 150
+        assert net.Nt == 340
+        conns = net['throat.conns'][net.throats('clone')]
+        assert np.all(conns >= 125)
+        assert np.all(conns < 150)
+
+    def test_add_boundary_pores_with_mask(self):
+        net = self._copy(self.net_5)
+        topotools.add_boundary_pores(network=net, pores=net['pore.left'],
+                                     offset=[0, 1, 0])
+        assert net.Np == 150
+        assert net.num_throats('boundary') == 25
+
     def test_clone_pores_mode_isolated(self):
-        net = op.network.Cubic(shape=[5, 5, 5])
+        net = self._copy(self.net_5)
         topotools.clone_pores(network=net, pores=net.pores('left'),
                               mode='isolated')
         assert net.Np == 150
         assert net.Nt == 300
 
     def test_merge_networks(self):
-        net1 = op.network.Cubic(shape=[3, 3, 3])
-        net2 = op.network.Cubic(shape=[3, 3, 3])
+        net1 = self._copy(self.net_3)
+        net2 = self._copy(self.net_3)
         net1['pore.test1'] = True
         net1['pore.test2'] = 10
         net1['pore.test3'] = np.ones((net1.Np, 3))
@@ -165,8 +205,18 @@ class TopotoolsTest:
         assert 'pore.test1' not in net2
         assert 'pore.test2' not in net2
 
+    def test_merge_networks_object_prop_on_network_only(self):
+        net1 = self._copy(self.net_3)
+        net2 = self._copy(self.net_3)
+        net1['pore.name'] = np.array(['a']*net1.Np, dtype=object)
+        topotools.merge_networks(network=net1, donor=net2)
+        assert net1['pore.name'].dtype == object
+        assert np.all(net1['pore.name'][:27] == 'a')
+        assert np.all(np.isnan(net1['pore.name'][27:].astype(float)))
+        assert 'pore.name' not in net2
+
     def test_subdivide_3D(self):
-        net = op.network.Cubic(shape=[3, 3, 3])
+        net = self._copy(self.net_3)
         assert net.Np == 27
         assert net.Nt == 54
         op.topotools.subdivide(net, pores=13, shape=[5, 5, 5], labels="blah")
@@ -186,7 +236,7 @@ class TopotoolsTest:
         assert net.Nt == 12 - 4 + 40 + 5 * 4
 
     def test_merge_pores(self):
-        testnet = op.network.Cubic(shape=[10, 10, 10])
+        testnet = self._copy(self.net_10)
         to_merge = [[0, 1], [998, 999]]
         topotools.merge_pores(testnet, to_merge)
         assert testnet.Np == 998
@@ -202,9 +252,9 @@ class TopotoolsTest:
 
         """
         # Subdivide first, then merge
-        testnet = op.network.Cubic(shape=[1, 10, 10])
+        testnet = self._copy(self.net_1_10)
         testnet["pore.to_merge"] = False
-        testnet["pore.to_merge"][[14, 15, 16, 24, 25, 26, 34, 35, 36]] = True
+        testnet["pore.to_merge"][MERGE_IDX] = True
         topotools.subdivide(testnet, pores=15, shape=[1, 10, 10],
                             labels="subdivided")
         topotools.merge_pores(testnet, labels="new_pore",
@@ -212,9 +262,9 @@ class TopotoolsTest:
         xyz_w_subdivide = testnet['pore.coords'][testnet.pores("new_pore")]
 
         # No subdivide, only merge
-        testnet = op.network.Cubic(shape=[1, 10, 10])
+        testnet = self._copy(self.net_1_10)
         testnet["pore.to_merge"] = False
-        testnet["pore.to_merge"][[14, 15, 16, 24, 25, 26, 34, 35, 36]] = True
+        testnet["pore.to_merge"][MERGE_IDX] = True
         topotools.merge_pores(testnet, labels="new_pore",
                               pores=testnet.pores("to_merge"))
         xyz_wo_subdivide = testnet['pore.coords'][testnet.pores("new_pore")]
@@ -223,7 +273,7 @@ class TopotoolsTest:
         assert_allclose(xyz_w_subdivide, xyz_wo_subdivide)
 
     def test_connect_pores(self):
-        testnet = op.network.Cubic(shape=[10, 10, 10])
+        testnet = self._copy(self.net_10)
         Nt_old= testnet.Nt
         ps1 = [[0, 1], [23, 65]]
         ps2 = [[55], [982, 555]]
@@ -233,15 +283,13 @@ class TopotoolsTest:
                                              fmt='csr')
         conns = testnet['throat.conns']
         assert len(conns) == Nt_old + 6
-        assert am[0, 55] == 1
-        assert am[1, 55] == 1
-        assert am[23, 982] == 1
-        assert am[23, 555] == 1
-        assert am[65, 982] == 1
-        assert am[65, 555] == 1
+        rows = np.array([0, 1, 23, 23, 65, 65])
+        cols = np.array([55, 55, 982, 555, 982, 555])
+        vals = np.asarray(am[rows, cols]).ravel()
+        assert np.all(vals == 1)
 
     def test_ispercolating(self):
-        net = op.network.Cubic(shape=[10, 10, 10], connectivity=26)
+        net = self.net_10_26
         tmask = net['throat.all']
         Pin = net.pores('left')
         Pout = net.pores('right')
@@ -254,31 +302,33 @@ class TopotoolsTest:
         assert val
 
     def test_trim_pores(self):
-        np.random.seed(1)
+        rng = np.random.default_rng(1)
         pn = op.network.Cubic(shape=[2, 2, 2], spacing=1)
-        Ps = pn.pores()[:4]
+        all_ps = pn.pores()
+        Ps = all_ps[:4]
         Ts = pn.find_neighbor_throats(pores=Ps, mode='xnor')
         geo1 = op.geometry.GenericGeometry(network=pn, pores=Ps, throats=Ts)
-        Ps = pn.pores()[4:]
+        Ps = all_ps[4:]
         Ts = pn.find_neighbor_throats(pores=Ps, mode='union')
         geo2 = op.geometry.GenericGeometry(network=pn, pores=Ps, throats=Ts)
-        geo1['pore.random'] = np.random.random(geo1.Np)
-        geo2['pore.random'] = np.random.random(geo2.Np)
+        geo1['pore.random'] = rng.random(geo1.Np)
+        geo2['pore.random'] = rng.random(geo2.Np)
         trimmers = pn['pore.random'] < 0.25
-        topotools.trim(pn, pores=pn.pores()[trimmers])
+        topotools.trim(pn, pores=all_ps[trimmers])
         assert ~np.any(pn['pore.random'] < 0.25)
 
     def test_trim_throats(self):
-        np.random.seed(1)
+        rng = np.random.default_rng(1)
         pn = op.network.Cubic(shape=[2, 2, 2], spacing=5)
-        Ps = pn.pores()[:4]
+        all_ps = pn.pores()
+        Ps = all_ps[:4]
         Ts1 = pn.find_neighbor_throats(pores=Ps, mode='or')
         geo1 = op.geometry.GenericGeometry(network=pn, pores=Ps, throats=Ts1)
-        Ps = pn.pores()[4:]
+        Ps = all_ps[4:]
         Ts2 = pn.find_neighbor_throats(pores=Ps, mode='xnor')
         geo2 = op.geometry.GenericGeometry(network=pn, pores=Ps, throats=Ts2)
-        geo1['throat.random'] = np.random.random(geo1.Nt)
-        geo2['throat.random'] = np.random.random(geo2.Nt)
+        geo1['throat.random'] = rng.random(geo1.Nt)
+        geo2['throat.random'] = rng.random(geo2.Nt)
         trimmers = pn['throat.random'] < 0.25
         topotools.trim(pn, throats=pn.throats()[trimmers])
         assert ~np.any(pn['throat.random'] < 0.25)
@@ -288,38 +338,43 @@ class TopotoolsTest:
         coords = [[0, 0, 0], [0, 0, 0], [0, 0, 1], [0, 0, 2], [0, 1, 2]]
         assert topotools.iscoplanar(coords)
         # NON-planar points, also with parallel vectors
-        coords = [[0, 0, 0], [0, 0, 0], [0, 0, 1], [0, 0, 2], [1, 1, 2]]
-        assert ~topotools.iscoplanar(coords)
+        coords = [[0, 0, 0], [0, 0, 0], [0, 0, 1], [0, 0, 2], [1, 1, 2],
+                  [1, 0, 0]]
+        assert not topotools.iscoplanar(coords)
         # Planar points, none parallel
         coords = [[0, 0, 0], [0, 1, 2], [0, 2, 1], [0, 3, 2], [0, 2, 3]]
         assert topotools.iscoplanar(coords)
         # Non-planar points, none parallel
         coords = [[0, 0, 0], [0, 1, 2], [0, 2, 1], [0, 3, 3], [1, 1, 2]]
-        assert ~topotools.iscoplanar(coords)
+        assert not topotools.iscoplanar(coords)
+        # 2D coordinates are not accepted
+        coords = [[0, 0], [0, 1], [1, 0]]
+        with pytest.raises(Exception):
+            topotools.iscoplanar(coords)
 
     def test_extend(self):
-        pn = op.network.Cubic(shape=[2, 2, 1])
+        pn = self._copy(self.net_2d)
         pn['pore.test_float'] = 1.0
         pn['pore.test_int'] = 1
         pn['pore.test_bool'] = True
         op.topotools.extend(network=pn, pore_coords=[[3, 3, 3], [3, 3, 4]])
-        assert np.any(np.isnan(pn['pore.test_float']))
-        assert np.any(np.isnan(pn['pore.test_int']))
+        assert np.isnan(pn['pore.test_float']).any()
+        assert np.isnan(pn['pore.test_int']).any()
         assert pn['pore.test_bool'].sum() < pn['pore.test_bool'].size
 
     def test_extend_geometry_present(self):
-        pn = op.network.Cubic(shape=[2, 2, 1])
+        pn = self._copy(self.net_2d)
         geo = op.geometry.StickAndBall(network=pn)
         geo['pore.test_float'] = 1.0
         geo['pore.test_int'] = 1
         geo['pore.test_bool'] = True
         op.topotools.extend(network=pn, pore_coords=[[3, 3, 3], [3, 3, 4]])
-        assert ~np.any(np.isnan(geo['pore.test_float']))
-        assert ~np.any(np.isnan(geo['pore.test_int']))
+        assert not np.isnan(geo['pore.test_float']).any()
+        assert not np.isnan(geo['pore.test_int']).any()
         assert geo['pore.test_bool'].sum() == geo['pore.test_bool'].size
 
     def test_extend_phase_present(self):
-        pn = op.network.Cubic(shape=[2, 2, 1])
+        pn = self._copy(self.net_2d)
         air = op.phases.Air(network=pn)
         air['pore.test_float'] = 1.0
         air['pore.test_int'] = 1
@@ -327,31 +382,33 @@ class TopotoolsTest:
         with pytest.raises(Exception):
             op.topotools.extend(network=pn, pore_coords=[[3, 3, 3], [3, 3, 4]])
 
+    @pytest.mark.serial
     def test_plot_networkx(self):
+        fig, ax = plt.subplots()
         # 2D networks in XY, YZ, XZ planes
         for i in range(3):
             shape = np.ones(3, dtype=int)
             shape[np.arange(3)!=i] = [5, 8]
             pn = op.network.Cubic(shape=shape)
             x, y = pn["pore.coords"].T[op.topotools.dimensionality(pn)]
-            fig, ax = plt.subplots()
+            ax.cla()
             m = op.topotools.plot_networkx(pn, ax=ax)
             x_plot, y_plot = np.array(m.get_offsets()).T
             np.testing.assert_allclose(x_plot, x)
             np.testing.assert_allclose(y_plot, y)
-            plt.close()
         # 1D networks in XY, YZ, XZ planes
         for i in range(3):
             shape = np.ones(3, dtype=int)
             shape[np.arange(3)==i] = [5]
             pn = op.network.Cubic(shape=shape)
             x, = pn["pore.coords"].T[op.topotools.dimensionality(pn)]
-            fig, ax = plt.subplots()
+            ax.cla()
             m = op.topotools.plot_networkx(pn, ax=ax)
             x_plot, y_plot = np.array(m.get_offsets()).T
             np.testing.assert_allclose(x_plot, x)
-            plt.close()
+        plt.close(fig)
 
+    @pytest.mark.serial
     def test_plot_networkx_3d(self):
         pn = op.network.Cubic(shape=[5, 8, 3])
         with pytest.raises(Exception):